@@ -15,10 +15,11 @@ echo "📂 Current directory: $(pwd)"
 echo "📄 Files in current directory:"
 ls -la
 
-# Kill any process using port 3030
-if lsof -ti:3030 >/dev/null ; then
+# Kill any process listening on port 3030 (-nP skips name lookups, -t prints bare PIDs)
+PORT_PIDS=$(lsof -nP -t -iTCP:3030 -sTCP:LISTEN || true)
+if [ -n "$PORT_PIDS" ]; then
     echo "🚫 Killing process on port 3030"
-    lsof -ti:3030 | xargs kill -9
+    echo "$PORT_PIDS" | xargs kill -9
 fi
 # Build the Slidev presentation in production mode
 echo "🔨 Running Slidev build..."
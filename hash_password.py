@@ -26,17 +26,18 @@ def main():
             print(f"Error: File {file_path} does not exist.")
             sys.exit(1)
             
-        with open(file_path, 'r') as f:
+        with open(file_path, 'rb') as f:
             passwords = f.read().splitlines()
         
         output_path = f"{file_path}"
-        # Clear the content of the file before writing hashed passwords
-        open(output_path, 'w').close()
-        with open(output_path, 'w') as f:
-            for password in passwords:
-                if password.strip():  # Skip empty lines
-                    hashed = hash_password(password)
-                    f.write(f"{hashed}\n")
+        # Hash everything up front and write the result in a single call
+        hashed = b''.join(
+            hashlib.sha256(password).hexdigest().encode() + b'\n'
+            for password in passwords
+            if password.strip()  # Skip empty lines
+        )
+        with open(output_path, 'wb') as f:
+            f.write(hashed)
         
         print(f"Hashed passwords written to {output_path}")
         
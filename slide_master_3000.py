@@ -5,13 +5,19 @@ import shutil
 import os
 import aiohttp
 import asyncio
-import requests
+import psutil
+import orjson
 import socket
 import time
 import logging
 import signal
-import re
-from typing import Dict, List, Tuple, Optional, Generator, Any, Union
+import hmac
+import threading
+import tempfile
+import errno
+from typing import Dict, List, Tuple, Optional, Generator, Any, Union, FrozenSet
+
+from slidev_tokens import is_unexpired
 
 # Configuration
 STREAMLIT_PASSWORD_FILE = Path(os.environ.get("STREAMLIT_PASSWORD_FILE", "./secrets/streamlit_passwords"))
@@ -19,47 +25,200 @@ GITHUB_TOKEN_FILE = Path(os.environ.get("GITHUB_TOKEN_FILE", "./secrets/github_t
 GITHUB_USER = os.environ.get("GITHUB_USER", "felixscode")
 GITHUB_REPO = os.environ.get("GITHUB_REPO", "slides")
 LOGLEVEL = logging.INFO
+TOKENS_COMPACTION_INTERVAL = 3600  # seconds between rewrites of the tokens file
+CACHE_DIR = Path(os.environ.get("SLIDEMASTER_CACHE_DIR", "./.cache"))
+MAX_CONCURRENT_DOWNLOADS = 16
+BLOB_CACHE_DIR = CACHE_DIR / "blobs"
+BLOB_TMP_MAX_AGE = 3600  # seconds after which an unfinished download in the blob cache is deleted
+GITHUB_TREE_FILE = CACHE_DIR / "github_tree.json"
+GITHUB_ETAG_FILE = CACHE_DIR / "github_tree.etag"
+GITHUB_TREE_TTL = 60  # seconds the cached GitHub tree is used without asking GitHub
+IGNORED_REPO_ITEMS = frozenset({"README.md", "slidev-dev.sh", ".gitignore"})
 
 
 # --- ASYNC API CALLS ---
-def _get_github_token() -> str:
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_github_token(mtime_ns: int) -> str:
     """
-    Retrieves the GitHub token from the token file.
+    Reads the GitHub token from the token file.
+    Cached across reruns and sessions on the file's modification time,
+    so a rotated token is picked up.
     
+    Args:
+        mtime_ns: Modification time of the token file, used as cache key
+        
     Returns:
         str: The GitHub token string
     """
     with open(GITHUB_TOKEN_FILE, "r") as f:
         return f.read().strip()
 
-async def _fetch_github_data() -> Dict[str, Any]:
+def _get_github_token() -> str:
+    """
+    Retrieves the GitHub token, re-reading the file only if it changed.
+    
+    Returns:
+        str: The GitHub token string
+    """
+    return _load_github_token(GITHUB_TOKEN_FILE.stat().st_mtime_ns)
+
+@st.cache_resource
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Starts an event loop in a background thread, shared by all sessions and reruns.
+    Keeping one loop alive lets the aiohttp session reuse its connections.
+    
+    Returns:
+        asyncio.AbstractEventLoop: The running background event loop
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="github-io", daemon=True).start()
+    return loop
+
+def _run_async(coro: Any) -> Any:
+    """
+    Runs a coroutine on the shared event loop and waits for its result.
+    
+    Args:
+        coro: Coroutine to execute
+        
+    Returns:
+        Any: The coroutine's return value
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop()).result()
+
+async def _create_client_session() -> aiohttp.ClientSession:
+    """
+    Creates the aiohttp session used for all GitHub requests.
+    
+    Returns:
+        aiohttp.ClientSession: Session with a pooled, keep-alive connector
+    """
+    connector = aiohttp.TCPConnector(
+        limit=2 * MAX_CONCURRENT_DOWNLOADS,
+        limit_per_host=MAX_CONCURRENT_DOWNLOADS,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+@st.cache_resource
+def _get_client_session() -> aiohttp.ClientSession:
+    """
+    Returns the shared aiohttp session, bound to the background event loop.
+    
+    Returns:
+        aiohttp.ClientSession: The shared session
+    """
+    return _run_async(_create_client_session())
+
+def _write_cache_file(path: Path, data: bytes) -> None:
+    """
+    Atomically writes a file to the disk cache.
+    
+    Args:
+        path: Destination path inside the cache directory
+        data: Content to write
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_name, path)
+
+def _read_tree_cache() -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Reads the cached GitHub tree from disk.
+    
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[str]]: The cached tree if it is
+        younger than GITHUB_TREE_TTL, else None, and the ETag to revalidate an
+        older cached tree with, if there is one
+    """
+    if not GITHUB_TREE_FILE.exists():
+        return None, None
+    if time.time() - GITHUB_TREE_FILE.stat().st_mtime < GITHUB_TREE_TTL:
+        return orjson.loads(GITHUB_TREE_FILE.read_bytes()), None
+    return None, GITHUB_ETAG_FILE.read_text() if GITHUB_ETAG_FILE.exists() else None
+
+def _renew_tree_cache() -> Dict[str, Any]:
+    """
+    Restarts the TTL of the cached GitHub tree after GitHub confirmed it is current.
+    
+    Returns:
+        Dict[str, Any]: The cached tree
+    """
+    os.utime(GITHUB_TREE_FILE)
+    return orjson.loads(GITHUB_TREE_FILE.read_bytes())
+
+def _store_tree_cache(body: bytes, etag: Optional[str]) -> Dict[str, Any]:
+    """
+    Stores a fresh GitHub tree response and its ETag on disk.
+    
+    Args:
+        body: Raw JSON body of the tree response
+        etag: ETag header of the response, if any
+        
+    Returns:
+        Dict[str, Any]: The parsed tree
+    """
+    _write_cache_file(GITHUB_TREE_FILE, body)
+    # The tree and its ETag are always replaced together, so an old tag never revalidates a newer body
+    if etag:
+        _write_cache_file(GITHUB_ETAG_FILE, etag.encode())
+    else:
+        GITHUB_ETAG_FILE.unlink(missing_ok=True)
+    return orjson.loads(body)
+
+async def _fetch_github_data(session: aiohttp.ClientSession, token: str) -> Tuple[int, Any]:
     """
     Fetches the folder structure from GitHub repository asynchronously.
+    The last response is kept on disk, used as is for GITHUB_TREE_TTL seconds
+    and then revalidated with its ETag, so an unchanged tree is answered with an empty 304.
+    Disk access runs in the default executor to keep the event loop free.
     
+    Args:
+        session: Shared aiohttp session
+        token: GitHub token used to authenticate
+        
     Returns:
-        Dict[str, Any]: JSON response from GitHub API containing repo structure
-        or empty list if there was an error
+        Tuple[int, Any]: HTTP status and either the JSON response containing
+        the repo structure or the error text
     """
-    token = _get_github_token()
     url = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/git/trees/main?recursive=1"
     headers = {"Authorization": f"token {token}"}
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status != 200:
-                st.error(f"GitHub API Error: {response.status}, {await response.text()}")
-                return []
-            return await response.json()
-
-@st.cache_data
+    loop = asyncio.get_running_loop()
+    cached_tree, etag = await loop.run_in_executor(None, _read_tree_cache)
+    if cached_tree is not None:
+        return 200, cached_tree
+    if etag:
+        headers["If-None-Match"] = etag
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            logging.info("GitHub tree unchanged, using cached copy")
+            return 200, await loop.run_in_executor(None, _renew_tree_cache)
+        if response.status != 200:
+            return response.status, await response.text()
+        body = await response.read()
+        etag = response.headers.get("ETag")
+
+    return 200, await loop.run_in_executor(None, _store_tree_cache, body, etag)
+
+@st.cache_data(ttl=GITHUB_TREE_TTL)
 def _get_github_data() -> Dict[str, Any]:
     """
-    Runs the async function synchronously and caches the result.
+    Runs the async function on the shared event loop and caches the result.
     
     Returns:
         Dict[str, Any]: Cached GitHub repository data
+        or empty list if there was an error
     """
-    return asyncio.run(_fetch_github_data())
+    status, data = _run_async(_fetch_github_data(_get_client_session(), _get_github_token()))
+    if status != 200:
+        st.error(f"GitHub API Error: {status}, {data}")
+        return []
+    return data
 
 def _match_pres_data(gh_data: Dict[str, Any]) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
     """
@@ -71,18 +230,27 @@ def _match_pres_data(gh_data: Dict[str, Any]) -> Generator[Tuple[str, Dict[str,
     Yields:
         Tuple[str, Dict[str, Any]]: Tuples of (presentation name, presentation data)
     """
-    items_to_ignore = ["README.md","slidev-dev.sh",'.gitignore']
-    for item in gh_data["tree"]:
-        if "/" not in item["path"] and item["path"] not in items_to_ignore:
-            name = item["path"]
-            slides_path_name = f"{name}/slides.md"
-            asset_path_name = f"{name}/assets/"
-            assets = list(filter(lambda x: x["path"].startswith(asset_path_name), gh_data["tree"]))
-            slides = next((x for x in gh_data["tree"] if x["path"] == slides_path_name), None)
-            if slides:
-                yield name, {"slides": slides, "assets": assets}
+    tree = gh_data["tree"]
+    # Collect the top-level folders first, then bucket every entry by its prefix in one pass
+    presentations = {
+        item["path"]: {"name": item["path"], "slides": None, "assets": []}
+        for item in tree
+        if "/" not in item["path"] and item["path"] not in IGNORED_REPO_ITEMS
+    }
+    for item in tree:
+        name, sep, rest = item["path"].partition("/")
+        if not sep or name not in presentations:
+            continue
+        if rest == "slides.md":
+            presentations[name]["slides"] = item
+        elif rest.startswith("assets/"):
+            presentations[name]["assets"].append(item)
+    for name, data in presentations.items():
+        if data["slides"]:
+            yield name, data
 
  
+@st.cache_data(ttl=GITHUB_TREE_TTL)
 def get_presentations() -> Dict[str, Dict[str, Any]]:
     """
     Extracts unique folder names from GitHub API response.
@@ -95,22 +263,48 @@ def get_presentations() -> Dict[str, Dict[str, Any]]:
     if not slide_data or "tree" not in slide_data:
         return {}
     
+    # Parsed presentations are stored on disk per tree SHA, which changes with every commit
+    tree_sha = slide_data.get("sha")
+    cache_file = CACHE_DIR / f"presentations_{tree_sha}.json"
+    if tree_sha and cache_file.exists():
+        return orjson.loads(cache_file.read_bytes())
+    
     presentations = dict(_match_pres_data(slide_data))
+    if tree_sha:
+        for stale in CACHE_DIR.glob("presentations_*.json"):
+            stale.unlink(missing_ok=True)
+        _prune_blob_cache(slide_data)
+        _write_cache_file(cache_file, orjson.dumps(presentations))
     return presentations if presentations else {}
 
 # --- AUTHENTICATION ---
 import hashlib
 import time
 
-def _get_hashed_passwords() -> List[str]:
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_hashed_passwords(mtime_ns: int) -> FrozenSet[str]:
     """
-    Reads hashed passwords from a file.
+    Reads hashed passwords from the password file.
+    Cached across reruns and sessions on the file's modification time,
+    so edits are picked up without restart.
     
+    Args:
+        mtime_ns: Modification time of the password file, used as cache key
+        
     Returns:
-        List[str]: List of valid hashed passwords
+        FrozenSet[str]: Set of valid hashed passwords
     """
     with open(STREAMLIT_PASSWORD_FILE, "r") as f:
-        return f.read().splitlines()
+        return frozenset(line.strip() for line in f.read().splitlines() if line.strip())
+
+def _get_hashed_passwords() -> FrozenSet[str]:
+    """
+    Returns the hashed passwords, re-reading the file only if it changed.
+    
+    Returns:
+        FrozenSet[str]: Set of valid hashed passwords
+    """
+    return _load_hashed_passwords(STREAMLIT_PASSWORD_FILE.stat().st_mtime_ns)
 
 def _hash_password(password: str) -> str:
     """
@@ -124,19 +318,20 @@ def _hash_password(password: str) -> str:
     """
     return hashlib.sha256(password.encode()).hexdigest()
 
-def _is_valid_hash(input_password: str, hashed_passwords: List[str]) -> bool:
+def _is_valid_hash(input_password: str, hashed_passwords: FrozenSet[str]) -> bool:
     """
     Checks if the hashed input password matches any stored hashed password.
+    Uses a constant-time comparison to avoid leaking timing information.
     
     Args:
         input_password: Plain text password from user
-        hashed_passwords: List of hashed passwords to check against
+        hashed_passwords: Set of hashed passwords to check against
         
     Returns:
         bool: True if password is valid, False otherwise
     """
     hashed_input = _hash_password(input_password)
-    return hashed_input in hashed_passwords
+    return any(hmac.compare_digest(hashed_input, hashed) for hashed in hashed_passwords)
 
 def authenticate() -> None:
     """
@@ -187,63 +382,307 @@ def authenticate() -> None:
 
 # --- PRESENTATION BUILD & VIEW ---
 
-def _download_from_github(local_filename: str, repo_dict: Dict[str, Any]) -> None:
+async def _download_from_github(session: aiohttp.ClientSession, headers: Dict[str, str], local_filename: str, repo_dict: Dict[str, Any]) -> bool:
     """
     Downloads a file from GitHub repository.
     
     Args:
+        session: Shared aiohttp session
+        headers: Request headers carrying the GitHub auth token and raw media type
         local_filename: The local path where the file will be saved
         repo_dict: Dictionary containing GitHub file information
+        
+    Returns:
+        bool: True if the file was downloaded, False if GitHub answered with an error
     """
-    token = _get_github_token()
-    headers = {"Authorization": f"token {token}"}
     file_path = repo_dict["path"]
-    url = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{file_path}?ref={'main'}"
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        file_data = response.json()
-        download_url = file_data["download_url"]
-
-        # Download the actual file
-        file_response = requests.get(download_url, headers=headers)
-        if file_response.status_code == 200:
-            with open(local_filename, "wb") as file:
-                file.write(file_response.content)
-            logging.info(f"Download successful: {file_path}")
-        else:
-            logging.error(f"Failed to download file: {file_response.status_code}")
+    # Fetched by blob SHA, so the content always matches the tree entry even if main moved on since
+    url = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/git/blobs/{repo_dict['sha']}"
+
+    # Fetch the raw file content in one request, streaming it to disk in chunks
+    async with session.get(url, headers=headers) as file_response:
+        if file_response.status != 200:
+            logging.error(f"Failed to download {file_path}: HTTP {file_response.status}")
+            return False
+        loop = asyncio.get_running_loop()
+        file = await loop.run_in_executor(None, open, local_filename, "wb")
+        try:
+            async for chunk in file_response.content.iter_chunked(64 * 1024):
+                await loop.run_in_executor(None, file.write, chunk)
+        finally:
+            await loop.run_in_executor(None, file.close)
+    logging.info(f"Download successful: {file_path}")
+    return True
+
+def _blob_cache_path(repo_dict: Dict[str, Any]) -> Path:
+    """
+    Returns the location of a GitHub file in the content-addressed blob cache.
+    
+    Args:
+        repo_dict: Dictionary containing GitHub file information
+        
+    Returns:
+        Path: Cache path named after the file's blob SHA
+    """
+    return BLOB_CACHE_DIR / repo_dict["sha"]
+
+def _prune_blob_cache(slide_data: Dict[str, Any]) -> None:
+    """
+    Deletes cached blobs that are no longer part of the GitHub tree.
+    Presentation files linked to them keep their content, they are only re-checked by hash.
+    
+    Args:
+        slide_data: GitHub tree API response
+    """
+    if not BLOB_CACHE_DIR.is_dir():
+        return
+    referenced = {item["sha"] for item in slide_data["tree"] if item.get("type") == "blob"}
+    now = time.time()
+    for entry in os.scandir(BLOB_CACHE_DIR):
+        if entry.name in referenced:
+            continue
+        try:
+            # Recent temp files belong to downloads in progress, older ones to interrupted runs
+            if entry.name.endswith(".tmp") and now - entry.stat().st_mtime < BLOB_TMP_MAX_AGE:
+                continue
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+async def _download_blob(session: aiohttp.ClientSession, headers: Dict[str, str], repo_dict: Dict[str, Any]) -> None:
+    """
+    Downloads a GitHub file into the blob cache.
+    The file is only published to the cache if its content matches the blob SHA,
+    so an interrupted or corrupted download is never reused. All disk I/O runs
+    in the default executor, keeping it off the event loop.
+    
+    Args:
+        session: Shared aiohttp session
+        headers: Request headers carrying the GitHub auth token and raw media type
+        repo_dict: Dictionary containing GitHub file information
+    """
+    loop = asyncio.get_running_loop()
+    tmp_name = await loop.run_in_executor(None, _create_blob_tmp_file)
+    try:
+        if not await _download_from_github(session, headers, tmp_name, repo_dict):
+            return
+        if not await loop.run_in_executor(None, _publish_blob, tmp_name, repo_dict):
+            logging.error(f"Content of {repo_dict['path']} does not match its blob SHA, discarding it")
+    finally:
+        await loop.run_in_executor(None, _discard_blob_tmp_file, tmp_name)
+
+def _create_blob_tmp_file() -> str:
+    """
+    Creates an empty, uniquely named file in the blob cache to download into.
+    
+    Returns:
+        str: Path of the created file
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=BLOB_CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    return tmp_name
+
+def _discard_blob_tmp_file(tmp_name: str) -> None:
+    """
+    Deletes a download's temp file if it wasn't published to the blob cache.
+    
+    Args:
+        tmp_name: Path of the downloaded file
+    """
+    try:
+        os.remove(tmp_name)
+    except FileNotFoundError:
+        pass
+
+def _publish_blob(tmp_name: str, repo_dict: Dict[str, Any]) -> bool:
+    """
+    Moves a downloaded file into the blob cache if its content matches the blob SHA.
+    
+    Args:
+        tmp_name: Path of the downloaded file
+        repo_dict: Dictionary containing GitHub file information
+        
+    Returns:
+        bool: True if the file was published, False if its content didn't match
+    """
+    if _git_blob_sha(tmp_name) != repo_dict["sha"]:
+        return False
+    # Read-only, since presentation files are hard links to the same inode
+    os.chmod(tmp_name, 0o444)
+    os.replace(tmp_name, _blob_cache_path(repo_dict))
+    return True
+
+async def _fetch_presentation_files(session: aiohttp.ClientSession, token: str, files: List[Dict[str, Any]]) -> None:
+    """
+    Downloads the given presentation files into the blob cache concurrently over one session.
+    
+    Args:
+        session: Shared aiohttp session
+        token: GitHub token used to authenticate
+        files: GitHub file information of the files to download
+    """
+    headers = {
+        "Authorization": f"token {token}",
+        # Makes the blobs endpoint answer with the file itself instead of base64 encoded JSON
+        "Accept": "application/vnd.github.raw+json",
+    }
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+    async def _download(repo_dict: Dict[str, Any]) -> None:
+        async with semaphore:
+            await _download_blob(session, headers, repo_dict)
+
+    await asyncio.gather(*(_download(repo_dict) for repo_dict in files))
+
+def _git_blob_sha(path: str) -> str:
+    """
+    Computes the git blob SHA-1 of a local file, as listed in GitHub tree entries.
+    
+    Args:
+        path: Path of the local file
+        
+    Returns:
+        str: Hex digest of the file's git blob hash
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, lambda: hashlib.sha1(b"blob %d\0" % size)).hexdigest()
 
+def _is_up_to_date(local_filename: str, repo_dict: Dict[str, Any]) -> bool:
+    """
+    Checks if a local file already has the content of its GitHub counterpart.
+    
+    Args:
+        local_filename: The local path of the file
+        repo_dict: Dictionary containing GitHub file information
+        
+    Returns:
+        bool: True if the local file matches the GitHub blob, False otherwise
+    """
+    if not os.path.isfile(local_filename):
+        return False
+    # A hard link to the cached blob is known to be current without hashing it
+    blob_path = _blob_cache_path(repo_dict)
+    if blob_path.exists() and os.path.samefile(local_filename, blob_path):
+        return True
+    return _git_blob_sha(local_filename) == repo_dict["sha"]
+
+# Errors of os.link meaning the filesystem can't hard-link the blob, so it is copied instead
+_NO_HARDLINK_ERRNOS = frozenset({errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP})
+
+def _link_from_cache(blob_path: Path, local_filename: str) -> None:
+    """
+    Puts a cached blob in place, hard-linking it where the filesystem allows.
+    
+    Args:
+        blob_path: Path of the blob in the cache
+        local_filename: The local path where the file is expected
+    """
+    # A unique, freshly created name, so no existing link to another blob is ever written through
+    fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(local_filename) or ".", suffix=".tmp")
+    os.close(fd)
+    os.remove(tmp_name)
+    try:
+        try:
+            os.link(blob_path, tmp_name)
+        except OSError as e:
+            if e.errno not in _NO_HARDLINK_ERRNOS:
+                raise
+            with open(blob_path, "rb") as src, open(tmp_name, "xb") as dst:
+                shutil.copyfileobj(src, dst)
+        os.replace(tmp_name, local_filename)
+    finally:
+        if os.path.lexists(tmp_name):
+            os.remove(tmp_name)
 
 def _cache_presentation(presentation: Dict[str, Any]) -> None:
     """
     Downloads and caches presentation files locally.
+    Files are kept in a blob cache by SHA, so unchanged files are neither
+    downloaded again nor rewritten, across presentations and restarts.
     
     Args:
         presentation: Dictionary containing presentation data
+        
+    Raises:
+        RuntimeError: If some of the presentation files could not be fetched
     """
-    if os.path.exists('./slides.md'):
-        os.remove('./slides.md')
-    if os.path.exists('./assets'):
-        shutil.rmtree('./assets')
-    os.makedirs('./assets')
-    _download_from_github("./slides.md", presentation["slides"])
-    for asset in presentation["assets"]:
-        _download_from_github(f"./assets/{asset['path'].split('/')[-1]}", asset)  
+    assets = {
+        f"./assets/{asset['path'].split('/')[-1]}": asset
+        for asset in presentation["assets"]
+        if asset.get("type", "blob") == "blob"
+    }
+    os.makedirs('./assets', exist_ok=True)
+    BLOB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Remove leftovers of previously shown presentations
+    for entry in os.scandir('./assets'):
+        if entry.path not in assets:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+
+    files = [("./slides.md", presentation["slides"]), *assets.items()]
+    outdated = [(local_filename, repo_dict) for local_filename, repo_dict in files if not _is_up_to_date(local_filename, repo_dict)]
+    # Only fetch what is in neither place, once per distinct blob
+    missing = {repo_dict["sha"]: repo_dict for _, repo_dict in outdated if not _blob_cache_path(repo_dict).exists()}
+    logging.info(f"{len(files) - len(outdated)} of {len(files)} presentation files are up to date, {len(missing)} to download")
+    # Drop the outdated files first, so a failed download never leaves another presentation's file behind
+    for local_filename, _ in outdated:
+        if os.path.lexists(local_filename):
+            os.remove(local_filename)
+    if missing:
+        _run_async(_fetch_presentation_files(_get_client_session(), _get_github_token(), list(missing.values())))
+
+    failed = []
+    for local_filename, repo_dict in outdated:
+        blob_path = _blob_cache_path(repo_dict)
+        if blob_path.exists():
+            _link_from_cache(blob_path, local_filename)
+        else:
+            failed.append(repo_dict["path"])
+    if failed:
+        raise RuntimeError(f"Could not fetch presentation files: {', '.join(failed)}")
 
-def _is_port_in_use(port: int) -> bool:
+def _is_port_in_use(port: int, timeout: float = 0.05) -> bool:
     """
     Checks if a port is currently in use.
     
     Args:
         port: Port number to check
+        timeout: Connect timeout in seconds, kept short since the check targets localhost
         
     Returns:
         bool: True if port is in use, False otherwise
     """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
         return s.connect_ex(('localhost', port)) == 0
 
+def _wait_for_port(port: int, timeout: float = 30.0, step: float = 0.05, proc: Optional[subprocess.Popen] = None) -> bool:
+    """
+    Waits until a process is listening on a port.
+    
+    Args:
+        port: Port number to wait for
+        timeout: Maximum number of seconds to wait
+        step: Seconds between two connection attempts
+        proc: Optional handle of the process expected to open the port;
+            waiting stops early if it exits
+        
+    Returns:
+        bool: True if the port came up before the deadline, False otherwise
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if _is_port_in_use(port, timeout=step):
+            return True
+        if proc is not None and proc.poll() is not None:
+            logging.error(f"Process {proc.pid} exited with code {proc.returncode} before opening port {port}")
+            return False
+        time.sleep(step)
+    return False
+
 def _start_slidev() -> None:
     """
     Build and serve Slidev in production mode.
@@ -252,37 +691,19 @@ def _start_slidev() -> None:
     _stop_slidev()
     logging.info("Building and starting Slidev")
     
-    # Run the build and serve script
-    subprocess.Popen(
+    # Run the build and serve script in its own process group so it can be stopped as a whole
+    st.session_state.slidev_proc = subprocess.Popen(
         ['bash', 'build_and_serve.sh'],
         cwd=str(Path("./").absolute()),
         stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
     )
     logging.info("...Slidev build process started")
 
-def _extract_pid(command_output: str) -> Optional[str]:
-    """
-    Extracts process ID from lsof command output.
-    
-    Args:
-        command_output: Output string from lsof command
-        
-    Returns:
-        Optional[str]: Process ID if found, None otherwise
-    """
-    lines = command_output.split("\n")[1:-1]
-    name_proc_tuples = [re.split(r"\s+", line) for line in lines]
-    
-    if name_proc_tuples:
-        # Return the first PID found
-        return name_proc_tuples[0][1]
-    else:
-        return None
-    
 def _find_process_using_port(port: int) -> Optional[int]:
     """
-    Finds the process using a specific port.
+    Finds the process listening on a specific port.
     
     Args:
         port: Port number to check
@@ -290,51 +711,74 @@ def _find_process_using_port(port: int) -> Optional[int]:
     Returns:
         Optional[int]: Process ID using the port or None if not found
     """
-    command = f"lsof -i :{port}"
-    result = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    def _is_listener(conn: Any) -> bool:
+        return bool(conn.laddr) and conn.laddr.port == port and conn.status == psutil.CONN_LISTEN
 
-    if result.returncode == 0:
-        logging.info("Process using the port found")
-        port_pid = _extract_pid(result.stdout)
-        if port_pid:
-            return int(port_pid)
-    else:
-        logging.info(f"No process found using port {port}")
+    try:
+        for conn in psutil.net_connections(kind='tcp'):
+            if _is_listener(conn) and conn.pid:
+                logging.info("Process using the port found")
+                return conn.pid
+    except psutil.AccessDenied:
+        # Outside Linux the system-wide table needs root, so check the processes we may inspect
+        for proc in psutil.process_iter():
+            try:
+                if any(_is_listener(conn) for conn in proc.net_connections(kind='tcp')):
+                    logging.info("Process using the port found")
+                    return proc.pid
+            except psutil.Error:
+                continue
+    logging.info(f"No process found using port {port}")
     return None
 
 
+def _terminate_process_group(proc: subprocess.Popen, timeout: float = 2.0) -> None:
+    """
+    Stops a process and its children with SIGTERM, escalating to SIGKILL after a timeout.
+    
+    Args:
+        proc: Handle of a process started as its own process group leader
+        timeout: Seconds to wait for a graceful shutdown
+    """
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.wait()
+        logging.info(f"Stopped process group {proc.pid}")
+    except ProcessLookupError:
+        # The whole group is already gone
+        proc.wait()
+
 def _stop_slidev() -> None:
     """
-    Stops any running Slidev process by finding and killing its PID.
-    Continuously checks until port 3030 is free.
+    Stops any running Slidev process.
+    Uses the process handle of this session if there is one and falls back to
+    the process listening on port 3030, e.g. one started by another session.
     """
-    # Check if port is in use
+    proc = st.session_state.pop("slidev_proc", None)
+    if proc is not None and proc.poll() is None:
+        logging.info("Stopping Slidev process of this session")
+        _terminate_process_group(proc)
+
+    # Check if port is still in use by a process we have no handle for
     if _is_port_in_use(3030):
         logging.info("Port 3030 is in use, stopping process")
-        
-        # Try to find and kill the process
         pid = _find_process_using_port(3030)
         if pid:
             try:
-                os.kill(pid, signal.SIGKILL)
-                logging.info(f"Killed process with PID {pid}")
-            except OSError as e:
-                logging.error(f"Failed to kill process: {e}")
-        
-        # Also try to kill Python HTTP server processes that might be serving on port 3030
-        try:
-            subprocess.run(
-                "pkill -f 'python -m http.server 3030'", 
-                shell=True, 
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
-            )
-            logging.info("Killed Python HTTP server processes")
-        except Exception as e:
-            logging.error(f"Failed to kill Python HTTP server: {e}")
-            
-        # Give processes time to shut down
-        time.sleep(1)
+                orphan = psutil.Process(pid)
+                orphan.terminate()
+                try:
+                    orphan.wait(timeout=2)
+                except psutil.TimeoutExpired:
+                    orphan.kill()
+                    orphan.wait(timeout=2)
+                logging.info(f"Stopped process with PID {pid}")
+            except psutil.Error as e:
+                logging.error(f"Failed to stop process: {e}")
 
 def _build_slidev(presentation: Dict[str, Any]) -> None:
     """
@@ -350,16 +794,53 @@ def _build_slidev(presentation: Dict[str, Any]) -> None:
         with st.spinner("⏲️ Preparing presentation..."):
             _cache_presentation(presentation)
             _start_slidev()
-            counter = 0
-            while not _is_port_in_use(3030):
-                counter += 0.1
-                time.sleep(counter)
-                logging.info("Waiting for Slidev to start...")
+            logging.info("Waiting for Slidev to start...")
+            if not _wait_for_port(3030, timeout=120.0, proc=st.session_state.slidev_proc):
+                raise TimeoutError("Slidev did not start listening on port 3030")
          
     except Exception as e:
         st.error("Sorry something went wrong")
         raise e # comment for prod
 
+@st.cache_resource
+def _get_tokens_file_state() -> Dict[str, Any]:
+    """
+    Process-wide lock and bookkeeping for the tokens file, shared by all sessions.
+    
+    Returns:
+        Dict[str, Any]: Lock guarding the file and time of the last compaction
+    """
+    return {"lock": threading.Lock(), "compacted_at": 0.0}
+
+def _compact_tokens_file(tokens_file: str) -> None:
+    """
+    Rewrites the tokens file, dropping expired and unreadable entries.
+    
+    Args:
+        tokens_file: Path of the JSONL tokens file
+    """
+    if not os.path.exists(tokens_file):
+        return
+    now = time.time()
+    kept = []
+    try:
+        with open(tokens_file, "rb") as f:
+            for line in f:
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                # Same check as the auth server, so it never drops a token that server accepts
+                if is_unexpired(entry, now):
+                    kept.append(line)
+        # Swap the file atomically so the auth server never sees a partial rewrite
+        tmp_file = f"{tokens_file}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.writelines(kept)
+        os.replace(tmp_file, tokens_file)
+    except Exception as e:
+        logging.error(f"Error compacting tokens file: {e}")
+
 def _generate_presentation_token(presentation_name: str) -> str:
     """
     Generate a secure token for accessing a presentation
@@ -371,7 +852,6 @@ def _generate_presentation_token(presentation_name: str) -> str:
         str: The generated token
     """
     import secrets
-    import json
     
     # Create a secure random token
     token = secrets.token_urlsafe(32)
@@ -387,25 +867,18 @@ def _generate_presentation_token(presentation_name: str) -> str:
         "user": st.session_state.get("user", "unknown")
     }
     
-    # Load existing tokens
-    tokens_file = os.environ.get("SLIDEV_TOKENS_FILE", "./secrets/slidev_tokens.json")
-    try:
-        if os.path.exists(tokens_file):
-            with open(tokens_file, "r") as f:
-                tokens = json.load(f)
-        else:
-            tokens = {}
-    except Exception as e:
-        logging.error(f"Error reading tokens file: {e}")
-        tokens = {}
-    
-    # Add the new token
-    tokens[token] = token_data
-    
-    # Save updated tokens
+    tokens_file = os.environ.get("SLIDEV_TOKENS_FILE", "./secrets/slidev_tokens.jsonl")
     os.makedirs(os.path.dirname(tokens_file), exist_ok=True)
-    with open(tokens_file, "w") as f:
-        json.dump(tokens, f)
+    state = _get_tokens_file_state()
+    with state["lock"]:
+        # Garbage-collect expired tokens once in a while instead of on every write
+        if time.time() - state["compacted_at"] > TOKENS_COMPACTION_INTERVAL:
+            _compact_tokens_file(tokens_file)
+            state["compacted_at"] = time.time()
+        
+        # Append the new token as a single JSON line
+        with open(tokens_file, "ab") as f:
+            f.write(orjson.dumps({"token": token, **token_data}) + b"\n")
     
     return token
 
@@ -416,9 +889,7 @@ def view_presentation(presentation: Dict[str, Any]) -> None:
     Args:
         presentation: Dictionary containing presentation data
     """
-    # Get the presentation name
-    presentations = get_presentations()
-    presentation_name = next(name for name, data in presentations.items() if data == presentation)
+    presentation_name = presentation["name"]
     
     # Build the slidev presentation
     _build_slidev(presentation)
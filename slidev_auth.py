@@ -1,51 +1,114 @@
 #!/usr/bin/env python3
 import http.server
-import socketserver
+import threading
 import urllib.parse
+import http.cookies
 import os
-import json
+import orjson
 import time
 import sys
 import logging
 
+from slidev_tokens import is_unexpired
+
 # Setup basic logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.WARNING,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger('slidev_auth')
 
 # Path to the tokens file (shared with the main app)
-TOKENS_FILE = os.environ.get('SLIDEV_TOKENS_FILE', '../secrets/slidev_tokens.json')
+TOKENS_FILE = os.environ.get('SLIDEV_TOKENS_FILE', '../secrets/slidev_tokens.jsonl')
+
+# Cookie carrying the access token, so sub-resources of a deck don't need it in the URL
+TOKEN_COOKIE = 'access_token'
+
+# Parsed tokens file, only re-read when the file's mtime or size changes
+_TOKENS_CACHE = {"stamp": None, "data": {}}
+_TOKENS_LOCK = threading.Lock()
+
+# Unexpired tokens as (token set, earliest expiry in the set, tokens dict it was built from)
+_VALID_TOKENS = (frozenset(), 0.0, None)
+
+def _parse_tokens(lines):
+    """
+    Parse the JSONL tokens file into a dict keyed by token
+    Expired entries and lines that can't be parsed (e.g. a half-written append) are skipped
+    """
+    now = time.time()
+    tokens = {}
+    for line in lines:
+        try:
+            entry = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        if not is_unexpired(entry, now):
+            continue
+        token = entry.pop("token", None)
+        if token:
+            tokens[token] = entry
+    return tokens
 
 def get_valid_tokens():
     """
     Load valid tokens from the tokens file
+    The parsed content is cached and reused until the file changes on disk
     Returns an empty dict if file doesn't exist or can't be read
     """
     try:
-        if os.path.exists(TOKENS_FILE):
-            with open(TOKENS_FILE, 'r') as f:
-                return json.load(f)
-        else:
-            logger.warning(f"Tokens file not found: {TOKENS_FILE}")
-            return {}
-    except Exception as e:
-        logger.error(f"Error reading tokens file: {e}")
+        stat = os.stat(TOKENS_FILE)
+    except FileNotFoundError:
+        logger.warning(f"Tokens file not found: {TOKENS_FILE}")
         return {}
+    
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if stamp == _TOKENS_CACHE["stamp"]:
+        return _TOKENS_CACHE["data"]
+    
+    with _TOKENS_LOCK:
+        if stamp == _TOKENS_CACHE["stamp"]:
+            return _TOKENS_CACHE["data"]
+        try:
+            with open(TOKENS_FILE, 'rb') as f:
+                _TOKENS_CACHE["data"] = _parse_tokens(f)
+            _TOKENS_CACHE["stamp"] = stamp
+            return _TOKENS_CACHE["data"]
+        except Exception as e:
+            logger.error(f"Error reading tokens file: {e}")
+            return {}
+
+def is_token_valid(token):
+    """
+    Check if a token is known and not expired
+    Uses a precomputed set of unexpired tokens, rebuilt only when the tokens file
+    is reloaded or the earliest token in the set expires
+    """
+    global _VALID_TOKENS
+    tokens = get_valid_tokens()
+    valid, valid_until, source = _VALID_TOKENS
+    now = time.time()
+    if source is not tokens or now >= valid_until:
+        expiries = {t: d["expires"] for t, d in tokens.items() if is_unexpired(d, now)}
+        valid = frozenset(expiries)
+        _VALID_TOKENS = (valid, min(expiries.values(), default=float('inf')), tokens)
+    return token in valid
 
 class TokenAuthHandler(http.server.SimpleHTTPRequestHandler):
     """
     HTTP handler that requires a valid access token for all requests
     """
+    # Send small responses right away instead of waiting on Nagle's algorithm
+    disable_nagle_algorithm = True
+
     def do_GET(self):
         # Parse URL to extract query parameters
         parsed_url = urllib.parse.urlparse(self.path)
-        query = parsed_url.query
-        params = urllib.parse.parse_qs(query)
+        params = dict(urllib.parse.parse_qsl(parsed_url.query))
         
-        # Extract token from query parameters
-        token = params.get('access_token', [''])[0]
+        # Extract token from query parameters, falling back to the cookie set on the first visit
+        query_token = params.get('access_token', '')
+        token = query_token or self._cookie_token()
         
         # Validate the token
         if not self._validate_token(token):
@@ -57,6 +120,9 @@ class TokenAuthHandler(http.server.SimpleHTTPRequestHandler):
             return
         
         # If we get here, token is valid
+        # Hand a token from the URL over to a cookie for the deck's follow-up requests
+        self._token_to_set = query_token
+        
         # Clean the path to serve the requested file without query parameters
         self.path = parsed_url.path if parsed_url.path else '/'
         
@@ -67,42 +133,58 @@ class TokenAuthHandler(http.server.SimpleHTTPRequestHandler):
         # Continue with normal request handling
         return super().do_GET()
     
+    def end_headers(self):
+        """
+        Attach the token cookie to successful responses of token-carrying URLs
+        """
+        token = getattr(self, '_token_to_set', '')
+        if token:
+            self.send_header('Set-Cookie', f"{TOKEN_COOKIE}={token}; Path=/; HttpOnly; SameSite=Lax")
+            self._token_to_set = ''
+        super().end_headers()
+    
+    def _cookie_token(self):
+        """
+        Read the access token from the request cookies, if any
+        """
+        header = self.headers.get('Cookie')
+        if not header:
+            return ''
+        cookie = http.cookies.SimpleCookie()
+        try:
+            cookie.load(header)
+        except http.cookies.CookieError:
+            return ''
+        morsel = cookie.get(TOKEN_COOKIE)
+        return morsel.value if morsel else ''
+    
     def _validate_token(self, token):
         """
         Check if a token is valid and not expired
         """
-        # For debugging, log token details
-        logger.info(f"Validating token request")
-        
         if not token:
-            logger.info("No token provided")
+            logger.debug("No token provided")
             return False
             
-        # Debug token storage
-        tokens = get_valid_tokens()
-        logger.info(f"Found {len(tokens)} tokens in storage")
-            
-        # Production validation logic (currently disabled for debugging)
-        if token not in tokens:
-            logger.info(f"Invalid token")
-            return False
-            
-        # Check if token is expired
-        token_data = tokens[token]
-        current_time = time.time()
-        
-        if "expires" not in token_data or token_data["expires"] < current_time:
-            logger.info(f"Expired token")
+        if not is_token_valid(token):
+            logger.debug("Invalid or expired token")
             return False
             
-        logger.info(f"Valid token access")
         return True
         
     def log_message(self, format, *args):
         """
         Override to use our logger instead of printing to stderr
         """
-        logger.info("%s - %s" % (self.address_string(), format % args))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+class TokenAuthServer(http.server.ThreadingHTTPServer):
+    """
+    Threaded HTTP server so asset requests of a deck are served concurrently
+    """
+    allow_reuse_address = True
+    daemon_threads = True
 
 def run_server(port=3030, bind="0.0.0.0"):
     """
@@ -111,7 +193,7 @@ def run_server(port=3030, bind="0.0.0.0"):
     server_address = (bind, port)
     
     # Create the HTTP server with our custom handler
-    httpd = socketserver.TCPServer(server_address, TokenAuthHandler)
+    httpd = TokenAuthServer(server_address, TokenAuthHandler)
     
     logger.info(f"Serving on {bind}:{port} with token authentication")
     
@@ -0,0 +1,16 @@
+"""
+Helpers for the JSONL access tokens file, shared by the Streamlit app and slidev_auth
+"""
+
+
+def is_unexpired(entry, now):
+    """
+    Check if a parsed tokens file entry carries a numeric expiry later than now
+    Entries that aren't objects or whose expiry is missing or not a number count as expired
+    """
+    if not isinstance(entry, dict):
+        return False
+    expires = entry.get("expires")
+    if isinstance(expires, bool) or not isinstance(expires, (int, float)):
+        return False
+    return expires > now